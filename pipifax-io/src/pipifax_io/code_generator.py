@@ -1,4 +1,12 @@
+import contextlib
 import dataclasses
+import hashlib
+import importlib.util
+import linecache
+import os
+import pathlib
+import tempfile
+import textwrap
 import typing
 
 
@@ -22,33 +30,15 @@ class AssignmentStatement:
 type Statement = LiteralStatement | AssignmentStatement
 
 
-@dataclasses.dataclass(frozen=True, slots=True)
-class _TracebackSourceContextManager:
-    src: str
-    name: str
-
-    def __enter__(self):
-        # import linecache
-        # 
-        # linecache.cache[self.name] = (
-        #     len(self.src),
-        #     None,
-        #     [line + '\n' for line in self.src.splitlines()],
-        #     self.name
-        # )
-        # print(linecache.cache)
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            lines = self.src.splitlines()
-
-            exc_val.add_note(
-                "Exception occurred in dynamically generated code.\n"
-                # f"{lines[exc_tb.tb_next.tb_lineno - 1]}\n\n"
-                f"Full source:\n{self.src}"
-            )
-            return False
+def _annotate_exception(exc: BaseException, src: str):
+    exc.add_note(
+        "Exception occurred in dynamically generated code.\n"
+        f"Full source:\n{src}"
+    )
+
+
+_ENTRY_NAME = "__pipifax_entry"
+DEFAULT_CACHE_DIR = pathlib.Path("~/.cache/pipifax-io").expanduser()
 
 
 @dataclasses.dataclass
@@ -57,7 +47,14 @@ class CodeGenerator:
         default_factory=lambda: {None: ([], 0)})
     current_function_stack: list[str] = dataclasses.field(default_factory=lambda: [None])
     consts: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    # id of every const to its variable, so that each object is bound to a single global
+    const_vars: dict[int, str] = dataclasses.field(default_factory=dict)
+    # module-level statements, emitted after all toplevel functions are defined
+    toplevel_statements: list[Statement] = dataclasses.field(default_factory=list)
+    # for every open block, whether a statement (not just comments) has been emitted into it
+    block_has_statement: list[bool] = dataclasses.field(default_factory=list)
     var_i: int = 0
+    global_var_i: int = 0
 
     @property
     def current_function(self) -> str:
@@ -84,9 +81,35 @@ class CodeGenerator:
     def get_vars(self, n: int = 1) -> list[str]:
         return [self.get_var() for _ in range(n)]
 
+    def get_global_var(self) -> str:
+        """Returns a module-wide unique name, e.g. for consts and toplevel functions. Unlike `get_var`, these names
+        are never reused by `scope`."""
+        try:
+            return f"gvar{self.global_var_i}"
+        finally:
+            self.global_var_i += 1
+
+    @contextlib.contextmanager
+    def scope(self):
+        """Variables from `get_var` allocated inside this block are reused afterwards, which keeps the number of
+        locals in the generated functions down. They must not be referenced after the block exits."""
+        var_i = self.var_i
+
+        try:
+            yield
+        finally:
+            self.var_i = var_i
+
     def get_const(self, val: typing.Any) -> str:
-        var = self.get_var()
+        # consts keeps val alive, so its id can't be reused while it's in const_vars
+        try:
+            return self.const_vars[id(val)]
+        except KeyError:
+            pass
+
+        var = self.get_global_var()
         self.consts[var] = val
+        self.const_vars[id(val)] = var
         return var
 
     def ensure_import(self, module: str):
@@ -94,29 +117,40 @@ class CodeGenerator:
 
     def indent(self):
         self.current_indent += 1
+        self.block_has_statement.append(False)
 
     def dedent(self):
-        self.literal("...")
+        if not self.block_has_statement.pop():
+            self.literal("pass")
+
         self.current_indent -= 1
 
     def begin_toplevel_function(self, name: str, args: list[str]):
         self.current_function_stack.append(name)
         self.functions[name] = ([], 0)
-        self.literal(f"def {name}({', '.join(args)}):")
+        # bypass add_statement, the header belongs to the new function and not to the caller's open block
+        self.current_statements.append((self.current_indent, LiteralStatement(f"def {name}({', '.join(args)}):")))
         self.indent()
 
     def end_toplevel_function(self, return_var: str | None):
         if return_var is not None:
             self.literal(f"return {return_var}")
 
+        self.dedent()
         self.current_function_stack.pop()
 
+    def toplevel_assign(self, left: str, right: str):
+        self.toplevel_statements.append(AssignmentStatement(left, right))
+
     def add_statement(self, statement: Statement):
         self.current_statements.append((self.current_indent, statement))
 
+        if self.block_has_statement:
+            self.block_has_statement[-1] = True
+
     def assign(self, left: str, right: str):
         if left == right:
-            left = "# " + left
+            return
 
         self.add_statement(
             AssignmentStatement(left, right)
@@ -134,10 +168,9 @@ class CodeGenerator:
             )
 
     def comment(self, *statements: str):
+        # bypass add_statement, comments don't make a block non-empty
         for statement in statements:
-            self.add_statement(
-                LiteralStatement("# " + statement)
-            )
+            self.current_statements.append((self.current_indent, LiteralStatement("# " + statement)))
 
     # def blocks(self) -> list[tuple[int, list[Statement]]]:
     #     blocks = []
@@ -175,6 +208,13 @@ class CodeGenerator:
             lines.append("")
             lines.append("")
 
+        if self.toplevel_statements:
+            for statement in self.toplevel_statements:
+                lines.append(statement.to_str())
+
+            lines.append("")
+            lines.append("")
+
         return (
             "\n".join(lines),
             "\n".join(
@@ -186,24 +226,84 @@ class CodeGenerator:
             )
         )
 
-    def compile(self, name: str, in_var: str = "inp", out_var: str = "out") -> typing.Callable:
+    def _entry_src(self, in_var: str, out_var: str) -> str:
         src_funcs, src_main = self.to_str()
 
+        # wrap the main statements in a function, so that variables are fast locals instead of dict entries
+        return (
+            src_funcs
+            + f"def {_ENTRY_NAME}({in_var}):\n"
+            + textwrap.indent(src_main, "    ")
+            + f"\n    return {out_var}\n"
+        )
+
+    def compile(self, name: str, in_var: str = "inp", out_var: str = "out") -> typing.Callable:
+        src = self._entry_src(in_var, out_var)
+
         # print(f"COMPILED {name}:\n{src}\n")
 
+        # the source is constant, so register it for tracebacks once instead of on every call
+        linecache.cache[name] = (
+            len(src),
+            None,
+            [line + "\n" for line in src.splitlines()],
+            name
+        )
+
         globals_ = self.consts.copy()
+        exec(compile(src, name, "exec", optimize=2), globals_)
+
+        return _wrap_entry(globals_[_ENTRY_NAME], src)
+
+    def compile_cached(
+        self,
+        in_var: str = "inp",
+        out_var: str = "out",
+        cache_dir: pathlib.Path = DEFAULT_CACHE_DIR
+    ) -> typing.Callable:
+        """
+        Like `compile`, but writes the generated source to `cache_dir` and imports it from there, so that its bytecode
+        is cached across processes. Constants are injected into the module namespace before it is executed.
+        """
+        src = self._entry_src(in_var, out_var)
+        hash_ = hashlib.sha256((src + repr(list(self.consts.keys()))).encode("utf-8")).hexdigest()[0:16]
+        path = cache_dir / f"{hash_}.py"
+
+        if not path.exists():
+            cache_dir.mkdir(exist_ok=True, parents=True)
+            _write_cache_file(path, src)
+
+        spec = importlib.util.spec_from_file_location(f"pipifax_io_compiled_{hash_}", path)
+        module = importlib.util.module_from_spec(spec)
+        module.__dict__.update(self.consts)
+        spec.loader.exec_module(module)
 
-        code_funcs = compile(src_funcs, name, "exec", optimize=2)
-        exec(code_funcs, globals_, globals_)
+        return _wrap_entry(module.__dict__[_ENTRY_NAME], src)
 
-        code_main = compile(src_main, name, "exec", optimize=2)
 
-        def func(data):
-            with _TracebackSourceContextManager(src_funcs + "\n\n" + src_main, name):
-                scope = {in_var: data}
+def _write_cache_file(path: pathlib.Path, src: str):
+    # other processes may be writing the same file concurrently, so each writes through its own temp file. the contents
+    # only depend on the file name, so it doesn't matter whose replace wins.
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp")
 
-                exec(code_main, globals_, scope)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(src.encode("utf-8"))
 
-                return scope[out_var]
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+
+        raise
+
+
+def _wrap_entry(entry: typing.Callable, src: str) -> typing.Callable:
+    def func(data):
+        try:
+            return entry(data)
+        except Exception as e:
+            _annotate_exception(e, src)
+            raise
 
-        return func
+    return func
@@ -1,6 +1,7 @@
 import base64
 import collections.abc
 import datetime
+import functools
 import json
 import types
 import typing
@@ -16,6 +17,10 @@ except ImportError:
     pass
 
 _SimpleJson = typing.Union[str, int, float, bool, None]
+_SIMPLE_JSON_TYPES = frozenset({str, int, float, bool, types.NoneType})
+_BLOB_TYPES = frozenset({bytes, bytearray})
+# bound once, every attribute access creates a new bound method, which would get its own const in generated code
+_DATETIME_FROMISOFORMAT = datetime.datetime.fromisoformat
 type JsonType = (
     _SimpleJson
     | collections.abc.Collection[JsonType]
@@ -79,42 +84,116 @@ class HasJsonSerializationCodegenSerializableMixin:
         return cls.deserialize_json(json.loads(data.decode("utf-8")))
 
 
-def _serialize_json_type_blind[T: JsonSerializableValue](data: T) -> JsonType:
+def _dumps_json_key(key: JsonType) -> str:
+    # same output as json.dumps(key), but skips setting up an encoder for the common simple keys
+    if isinstance(key, str):
+        return json.encoder.encode_basestring_ascii(key)
+
+    if key is None:
+        return "null"
+
+    if isinstance(key, bool):
+        return "true" if key else "false"
+
+    if isinstance(key, int):
+        return int.__repr__(key)
+
+    return json.dumps(key)
+
+
+def _serialize_simple_type_blind(data: _SimpleJson) -> JsonType:
+    return data
+
+
+def _serialize_bytes_type_blind(data: bytes) -> JsonType:
+    return base64.b64encode(data).decode("utf-8")
+
+
+def _serialize_serializable_type_blind(data: HasJsonSerializationCodegenSerializableMixin) -> JsonType:
+    return data.serialize_json()
+
+
+def _serialize_datetime_type_blind(data: datetime.datetime) -> JsonType:
+    return data.isoformat()
+
+
+def _serialize_pydantic_model_type_blind(data: "pydantic.BaseModel") -> JsonType:
+    return data.model_dump(mode="json")
+
+
+def _serialize_pydantic_model_class_type_blind(data: "type[pydantic.BaseModel]") -> JsonType:
+    return data.model_json_schema(mode="validation")
+
+
+def _serialize_mapping_type_blind(data: collections.abc.Mapping) -> JsonType:
+    return {
+        _dumps_json_key(_serialize_json_type_blind(key)): _serialize_json_type_blind(value)
+        for key, value in data.items()
+    }
+
+
+def _serialize_collection_type_blind(data: collections.abc.Collection) -> JsonType:
+    return [_serialize_json_type_blind(item) for item in data]
+
+
+def _resolve_type_blind_handler(data: typing.Any) -> typing.Callable[[typing.Any], JsonType] | None:
     if isinstance(data, _SimpleJson):
-        return data
+        return _serialize_simple_type_blind
 
     if isinstance(data, bytes):
-        return base64.b64encode(data).decode("utf-8")
+        return _serialize_bytes_type_blind
 
     if hasattr(data, "serialize_json"):
-        return data.serialize_json()
+        return _serialize_serializable_type_blind
 
     if isinstance(data, collections.abc.Mapping):
-        return {
-            json.dumps(_serialize_json_type_blind(key)): _serialize_json_type_blind(value)
-            for key, value in data.items()
-        }
+        return _serialize_mapping_type_blind
 
     if isinstance(data, collections.abc.Collection):
-        return [_serialize_json_type_blind(item) for item in data]
+        return _serialize_collection_type_blind
 
     if isinstance(data, datetime.datetime):
-        return data.isoformat()
+        return _serialize_datetime_type_blind
 
     if pydantic is not None:
         if isinstance(data, pydantic.BaseModel):
-            return data.model_dump(mode="json")
+            return _serialize_pydantic_model_type_blind
         elif isinstance(data, type(pydantic.BaseModel)):
-            return data.model_json_schema(mode="validation")
+            return _serialize_pydantic_model_class_type_blind
+
+    return None
+
+
+# resolved handlers by exact type, so that only the first value of each type walks the isinstance checks above
+_TYPE_BLIND_HANDLERS: dict[type, typing.Callable[[typing.Any], JsonType]] = {}
+
+
+def _serialize_json_type_blind[T: JsonSerializableValue](data: T) -> JsonType:
+    handler = _TYPE_BLIND_HANDLERS.get(type(data))
+
+    if handler is None:
+        handler = _resolve_type_blind_handler(data)
+
+        if handler is None:
+            raise serializable_errors.SerializationError(f"Serialization of {data!r} not supported.")
 
-    raise serializable_errors.SerializationError(f"Serialization of {data!r} not supported.")
+        # classes share their metaclass as type, but the handler depends on the class itself (e.g. serialize_json)
+        if not isinstance(data, type):
+            _TYPE_BLIND_HANDLERS[type(data)] = handler
 
+    return handler(data)
 
+
+@type_serializer.cache_by_type_hint()
 def _issubclass_json_type(tp: type_serializer.TypeHint) -> bool:
-    if tp in (str, int, float, bool, types.NoneType, None):
+    if tp is None:
         return True
-    elif tp in (bytes, bytearray):
-        return False
+
+    if isinstance(tp, type):
+        if tp in _SIMPLE_JSON_TYPES:
+            return True
+        elif tp in _BLOB_TYPES:
+            return False
 
     origin, args = type_serializer.read_type_hint(tp)
 
@@ -155,9 +234,14 @@ def _issubclass_json_type(tp: type_serializer.TypeHint) -> bool:
 
 
 class JsonSerializerCodegen(type_serializer.SerializerCodegen):
+    scalar_types = _SIMPLE_JSON_TYPES
+
     def is_scalar(self, type_: type_serializer.TypeHint) -> bool:
         return _issubclass_json_type(type_)
 
+    def compiles_to_identity(self, type_: type_serializer.TypeHint) -> bool:
+        return _issubclass_json_type(type_)
+
     def scalar(self, type_: type_serializer.TypeHint, in_var: str, out_var: str):
         self.codegen.assign(out_var, in_var)
 
@@ -169,6 +253,13 @@ class JsonSerializerCodegen(type_serializer.SerializerCodegen):
         base_class, _ = type_serializer.read_type_hint(key_type)
         if isinstance(base_class, type) and issubclass(base_class, str):
             key_var, value_var = self.codegen.get_vars(2)
+            value_expr = self.expr(value_type, value_var)
+
+            if value_expr is not None:
+                self.codegen.assign(
+                    out_var, f"{{{key_var}: {value_expr} for {key_var}, {value_var} in {in_var}.items()}}"
+                )
+                return
 
             self.codegen.literal(f"{out_var} = {in_var}.copy()")
             self.codegen.literal(f"for {key_var}, {value_var} in {out_var}.items():")
@@ -180,6 +271,8 @@ class JsonSerializerCodegen(type_serializer.SerializerCodegen):
             super().mapping(base_type, key_type, value_type, in_var, out_var)
 
     def union(self, args: tuple[type_serializer.TypeHint, ...], in_var: str, out_var: str):
+        args = type_serializer.flatten_union(args)
+
         # TODO for all scaler types, not just None?
         if types.NoneType in args:
             self.codegen.literal(f"if {in_var} is not None:")
@@ -193,32 +286,73 @@ class JsonSerializerCodegen(type_serializer.SerializerCodegen):
         else:
             super().union(args, in_var, out_var)
 
-    def type_(self, type_: type_serializer.TypeHint, base_type: type, args: tuple[type_serializer.TypeHint, ...],
-              in_var: str, out_var: str):
+    def union_expr(self, args: tuple[type_serializer.TypeHint, ...], in_expr: str) -> str | None:
+        args = type_serializer.flatten_union(args)
+
+        if types.NoneType in args:
+            not_none_expr = self.expr(typing.Union[*[a for a in args if a is not types.NoneType]], in_expr)
+
+            if not_none_expr is None:
+                return None
+
+            return f"None if {in_expr} is None else {not_none_expr}"
+
+        return super().union_expr(args, in_expr)
+
+    def expr(self, type_: type_serializer.TypeHint, in_expr: str) -> str | None:
+        out = super().expr(type_, in_expr)
+
+        if out is None:
+            base_type, _ = type_serializer.read_type_hint(type_)
+
+            if isinstance(base_type, type):
+                out = self._leaf_expr(base_type, in_expr)
+
+        return out
+
+    def _leaf_expr(self, base_type: type, in_expr: str) -> str | None:
         if issubclass(base_type, bytes):
-            self.codegen.ensure_import("base64")
-            self.codegen.assign(out_var, f"base64.b64encode({in_var}).decode()")
-            return
+            b64encode_var = self.codegen.get_const(base64.b64encode)
+            return f"{b64encode_var}({in_expr}).decode()"
 
         if issubclass(base_type, datetime.datetime):
-            self.codegen.assign(out_var, f"{in_var}.isoformat()")
-            return
+            return f"{in_expr}.isoformat()"
 
         if hasattr(base_type, "_compile_json_serializer"):
-            base_type._compile_json_serializer(in_var, out_var, self)
-            return
+            return None
 
         if pydantic is not None:
             if issubclass(base_type, pydantic.BaseModel):
-                self.codegen.assign(out_var, f"{in_var}.model_dump(mode='json')")
-                return
+                # TypeAdapter builds pydantic's compiled serializer once, instead of dispatching through model_dump. it
+                # would serialize subclass instances with the declared model's fields though, so those still go
+                # through model_dump.
+                adapter_var = self.codegen.get_const(_type_adapter(base_type))
+                model_var = self.codegen.get_const(base_type)
+                return (
+                    f"({adapter_var}.dump_python({in_expr}, mode='json') if type({in_expr}) is {model_var} "
+                    f"else {in_expr}.model_dump(mode='json'))"
+                )
             elif issubclass(base_type, type(pydantic.BaseModel)):
-                self.codegen.assign(out_var, f"{in_var}.model_json_schema(mode='validation')")
-                return
+                return f"{in_expr}.model_json_schema(mode='validation')"
+
+        return None
+
+    def type_(self, type_: type_serializer.TypeHint, base_type: type, args: tuple[type_serializer.TypeHint, ...],
+              in_var: str, out_var: str):
+        leaf_expr = self._leaf_expr(base_type, in_var)
+
+        if leaf_expr is not None:
+            self.codegen.assign(out_var, leaf_expr)
+            return
+
+        if hasattr(base_type, "_compile_json_serializer"):
+            base_type._compile_json_serializer(in_var, out_var, self)
+            return
 
         super().type_(type_, base_type, args, in_var, out_var)
 
 
+@type_serializer.cache_by_type_hint()
 def _issubclass_json_decode_type(tp) -> bool:
     """
     Returns True if `tp` is one of:
@@ -237,7 +371,7 @@ def _issubclass_json_decode_type(tp) -> bool:
         return all(_issubclass_json_decode_type(arg) for arg in args)
 
     # Simple JSON types
-    if tp in (str, int, float, bool, type(None)):
+    if isinstance(tp, type) and tp in _SIMPLE_JSON_TYPES:
         return True
 
     # list[...]
@@ -254,13 +388,22 @@ def _issubclass_json_decode_type(tp) -> bool:
 
 
 class JsonDeserializerCodegen(type_serializer.DeserializerCodegen):
+    scalar_types = _SIMPLE_JSON_TYPES
+
     def is_scalar(self, type_: type_serializer.TypeHint) -> bool:
         return _issubclass_json_decode_type(type_)
 
+    def compiles_to_identity(self, type_: type_serializer.TypeHint) -> bool:
+        return _issubclass_json_decode_type(type_)
+
     def scalar(self, type_: type_serializer.TypeHint, in_var: str, out_var: str):
         self.codegen.assign(out_var, in_var)
 
     def tuple_(self, class_: type, in_vars: list[str], out_var: str):
+        if class_ is tuple:
+            self.codegen.assign(out_var, f"({', '.join(in_vars)},)")
+            return
+
         class_var = self.codegen.get_const(class_)
         self.codegen.assign(out_var, f"{class_var}(({', '.join(in_vars)},))")
 
@@ -269,6 +412,13 @@ class JsonDeserializerCodegen(type_serializer.DeserializerCodegen):
         base_class, _ = type_serializer.read_type_hint(key_type)
         if isinstance(base_class, type) and issubclass(base_class, str):
             key_var, value_var = self.codegen.get_vars(2)
+            value_expr = self.expr(value_type, value_var)
+
+            if value_expr is not None:
+                self.codegen.assign(
+                    out_var, f"{{{key_var}: {value_expr} for {key_var}, {value_var} in {in_var}.items()}}"
+                )
+                return
 
             self.codegen.literal(f"{out_var} = {in_var}.copy()")
             self.codegen.literal(f"for {key_var}, {value_var} in {out_var}.items():")
@@ -280,6 +430,8 @@ class JsonDeserializerCodegen(type_serializer.DeserializerCodegen):
             super().mapping(class_, key_type, value_type, in_var, out_var)
 
     def union(self, args: tuple[type_serializer.TypeHint, ...], in_var: str, out_var: str):
+        args = type_serializer.flatten_union(args)
+
         if types.NoneType in args:
             self.codegen.literal(f"if {in_var} is not None:")
             self.codegen.indent()
@@ -292,46 +444,106 @@ class JsonDeserializerCodegen(type_serializer.DeserializerCodegen):
         else:
             super().union(args, in_var, out_var)
 
-    def type_(self, type_: type_serializer.TypeHint, base_type: type, args: tuple[type_serializer.TypeHint, ...],
-              in_var: str, out_var: str):
+    def expr(self, type_: type_serializer.TypeHint, in_expr: str) -> str | None:
+        out = super().expr(type_, in_expr)
+
+        if out is None:
+            base_type, _ = type_serializer.read_type_hint(type_)
+
+            if isinstance(base_type, type):
+                out = self._leaf_expr(base_type, in_expr)
+
+        return out
+
+    def _leaf_expr(self, base_type: type, in_expr: str) -> str | None:
         if issubclass(base_type, bytes):
-            self.codegen.ensure_import("base64")
-            self.codegen.assign(out_var, f"base64.b64decode({in_var}.encode())")
-            return
+            b64decode_var = self.codegen.get_const(base64.b64decode)
+            return f"{b64decode_var}({in_expr}.encode())"
 
         if issubclass(base_type, datetime.datetime):
-            datetime_const = self.codegen.get_const(datetime.datetime)
-            self.codegen.assign(out_var, f"{datetime_const}.fromisoformat({in_var})")
-            return
+            fromisoformat_var = self.codegen.get_const(_DATETIME_FROMISOFORMAT)
+            return f"{fromisoformat_var}({in_expr})"
 
         if hasattr(base_type, "_compile_json_deserializer"):
-            base_type._compile_json_deserializer(in_var, out_var, self)
-            return
+            return None
 
         if pydantic is not None:
             if issubclass(base_type, pydantic.BaseModel):
-                base_type_var = self.codegen.get_const(base_type)
-                self.codegen.assign(out_var, f"{base_type_var}.model_validate({in_var})")
-                return
+                adapter_var = self.codegen.get_const(_type_adapter(base_type))
+                return f"{adapter_var}.validate_python({in_expr})"
+
+        return None
+
+    def type_(self, type_: type_serializer.TypeHint, base_type: type, args: tuple[type_serializer.TypeHint, ...],
+              in_var: str, out_var: str):
+        leaf_expr = self._leaf_expr(base_type, in_var)
+
+        if leaf_expr is not None:
+            self.codegen.assign(out_var, leaf_expr)
+            return
+
+        if hasattr(base_type, "_compile_json_deserializer"):
+            base_type._compile_json_deserializer(in_var, out_var, self)
+            return
 
         super().type_(type_, base_type, args, in_var, out_var)
 
 
+@functools.cache
+def _type_adapter(model: "type[pydantic.BaseModel]") -> "pydantic.TypeAdapter":
+    # one adapter per model, so that generated code binds it to a single const
+    return pydantic.TypeAdapter(model)
+
+
+def _pydantic_model_dumper(model: "type[pydantic.BaseModel]") -> typing.Callable[["pydantic.BaseModel"], JsonType]:
+    dump_python = functools.partial(_type_adapter(model).dump_python, mode="json")
+
+    def dump(value: "pydantic.BaseModel") -> JsonType:
+        # the adapter would drop the fields of subclasses, model_dump keeps them
+        if type(value) is model:
+            return dump_python(value)
+
+        return value.model_dump(mode="json")
+
+    return dump
+
+
+def _is_pydantic_model(type_: type_serializer.TypeHint, codegen_hook: str) -> bool:
+    return (
+        pydantic is not None
+        and isinstance(type_, type)
+        and issubclass(type_, pydantic.BaseModel)
+        and not hasattr(type_, codegen_hook)
+    )
+
+
+@type_serializer.cache_by_type_hint(order_sensitive=True)
 def compile_json_serializer[T: JsonSerializableValue](
-    type_: type[T]
+    type_: type[T],
+    persistent: bool = False
 ) -> typing.Callable[[T], JsonType]:
-    codegen = code_generator.CodeGenerator()
-    serializer_codegen = JsonSerializerCodegen(codegen)
-    serializer_codegen.any(
-        type_,
-        "inp",
-        "out",
-    )
-    func = codegen.compile(
-        name=f"<pipifax_io compiled json serialization for {repr(type_)}>",
-        in_var="inp",
-        out_var="out",
-    )
+    if _is_pydantic_model(type_, "_compile_json_serializer"):
+        # pydantic already compiles a serializer, generated code would only add a call around it
+        func = _pydantic_model_dumper(type_)
+    else:
+        codegen = code_generator.CodeGenerator()
+        serializer_codegen = JsonSerializerCodegen(codegen)
+        serializer_codegen.any(
+            type_,
+            "inp",
+            "out",
+        )
+        if persistent:
+            func = codegen.compile_cached(
+                in_var="inp",
+                out_var="out",
+            )
+        else:
+            func = codegen.compile(
+                name=f"<pipifax_io compiled json serialization for {repr(type_)}>",
+                in_var="inp",
+                out_var="out",
+            )
 
     def wrapper(data):
         try:
@@ -342,20 +554,28 @@ def compile_json_serializer[T: JsonSerializableValue](
     return wrapper
 
 
+@type_serializer.cache_by_type_hint(order_sensitive=True)
 def compile_json_deserializer[T: JsonSerializableValue](
-    type_: type[T]
+    type_: type[T],
+    persistent: bool = False
 ) -> typing.Callable[[JsonType], T]:
-    codegen = code_generator.CodeGenerator()
-    deserializer_codegen = JsonDeserializerCodegen(codegen)
-    deserializer_codegen.any(
-        type_,
-        "inp",
-        "out",
-    )
-
-    func = codegen.compile(
-        name=f"<pipifax_io compiled json deserialization for {repr(type_)}>"
-    )
+    if _is_pydantic_model(type_, "_compile_json_deserializer"):
+        func = _type_adapter(type_).validate_python
+    else:
+        codegen = code_generator.CodeGenerator()
+        deserializer_codegen = JsonDeserializerCodegen(codegen)
+        deserializer_codegen.any(
+            type_,
+            "inp",
+            "out",
+        )
+
+        if persistent:
+            func = codegen.compile_cached()
+        else:
+            func = codegen.compile(
+                name=f"<pipifax_io compiled json deserialization for {repr(type_)}>"
+            )
 
     def wrapper(data):
         try:
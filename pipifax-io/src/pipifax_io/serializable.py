@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 import pathlib
 import typing
 
@@ -87,6 +88,12 @@ class SimpleSerializable(json_serialization.HasJsonSerializationCodegenSerializa
 
     @classmethod
     def _get_serialize_fields(cls) -> dict[str, type]:
+        # a copy, so that overrides can modify the result without corrupting the cache
+        return cls._get_serialize_fields_cached().copy()
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_serialize_fields_cached(cls) -> dict[str, type]:
         # noinspection PyTypeChecker,PyDataclass
         dataclass_fields = dataclasses.fields(cls)
 
@@ -115,12 +122,15 @@ class SimpleSerializable(json_serialization.HasJsonSerializationCodegenSerializa
         fields = cls._get_serialize_fields()
 
         for field_name, field_type in fields.items():
-            tmp = serializer.codegen.get_var()
-            out.append((field_name, tmp))
+            # emit fields that convert with a single expression inline into the output literal
+            field_expr = serializer.expr(field_type, f"{in_var}.{field_name}")
 
-            serializer.codegen.assign(tmp, f"{in_var}.{field_name}")
+            if field_expr is None:
+                field_expr = serializer.codegen.get_var()
+                serializer.codegen.assign(field_expr, f"{in_var}.{field_name}")
+                serializer.any(field_type, field_expr, field_expr)
 
-            serializer.any(field_type, tmp, tmp)
+            out.append((field_name, field_expr))
 
         if cls.__simple_serializable_include_field_names__:
             serializer.codegen.assign(out_var, "{" + ", ".join([f"{name!r}: {v}" for name, v in out]) + "}")
@@ -154,13 +164,14 @@ class SimpleSerializable(json_serialization.HasJsonSerializationCodegenSerializa
         deserializer.codegen.assign(tmp, f"{cls_var}.__new__({cls_var})")
 
         for i, (field_name, field_type) in enumerate(fields.items()):
-            tmp2 = deserializer.codegen.get_var()
             if cls.__simple_serializable_include_field_names__:
-                deserializer.any(field_type, f"{in_var}[{field_name!r}]", tmp2)
+                field_in = f"{in_var}[{field_name!r}]"
             else:
-                deserializer.any(field_type, f"{in_var}[{i}]", tmp2)
+                field_in = f"{in_var}[{i}]"
+
+            field_out = deserializer.emit(field_type, field_in, deserializer.codegen.get_var())
 
-            deserializer.codegen.literal(f"object.__setattr__({tmp}, {field_name!r}, {tmp2})")
+            deserializer.codegen.literal(f"object.__setattr__({tmp}, {field_name!r}, {field_out})")
 
         deserializer.codegen.literal(f"{tmp}.__deserialize_init__()")
 
@@ -1,6 +1,7 @@
 import abc
 import collections
 import dataclasses
+import functools
 import types
 import typing
 
@@ -25,7 +26,67 @@ class SerializeAs:
     value: TypeHint
 
 
+def cache_by_type_hint[R](order_sensitive: bool = False):
+    """
+    Memoizes a function whose first argument is a type hint. Further arguments must be hashable.
+
+    `typing.Union` compares equal regardless of the order of its arguments. If the result depends on that order (e.g.
+    isinstance precedence in generated code), pass `order_sensitive=True` to additionally key on the repr of the hint.
+    Unhashable type hints (e.g. `typing.Annotated` with unhashable metadata) bypass the cache.
+    """
+
+    def decorator(func: typing.Callable[..., R]) -> typing.Callable[..., R]:
+        @functools.lru_cache(maxsize=None)
+        def cached(type_: TypeHint, _type_repr: str | None, *args, **kwargs) -> R:
+            return func(type_, *args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(type_: TypeHint, *args, **kwargs) -> R:
+            try:
+                hash(type_)
+            except TypeError:
+                return func(type_, *args, **kwargs)
+
+            return cached(type_, repr(type_) if order_sensitive else None, *args, **kwargs)
+
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+
+    return decorator
+
+
+# keyed by identity: equal unions may differ in the order of their arms, which is part of the result. keeping the type
+# hint alive in the value guarantees its id isn't reused.
+_READ_TYPE_HINT_CACHE: dict[int, tuple[TypeHint, tuple[TypeHint, tuple[TypeHint, ...]]]] = {}
+_READ_TYPE_HINT_CACHE_MAX_SIZE = 4096
+
+
 def read_type_hint(type_: TypeHint) -> tuple[TypeHint, tuple[TypeHint, ...]]:
+    try:
+        cached_type, out = _READ_TYPE_HINT_CACHE[id(type_)]
+    except KeyError:
+        pass
+    else:
+        if cached_type is type_:
+            return out
+
+    out = _read_type_hint(type_)
+
+    try:
+        hash(type_)
+    except TypeError:
+        # unhashable hints bypass the compile caches, so each call would pin a new hint object here
+        return out
+
+    # the entries keep their hints alive, so bound the cache in case hints keep being created dynamically
+    if len(_READ_TYPE_HINT_CACHE) >= _READ_TYPE_HINT_CACHE_MAX_SIZE:
+        _READ_TYPE_HINT_CACHE.clear()
+
+    _READ_TYPE_HINT_CACHE[id(type_)] = type_, out
+    return out
+
+
+def _read_type_hint(type_: TypeHint) -> tuple[TypeHint, tuple[TypeHint, ...]]:
     if type_ is None:
         type_ = types.NoneType
 
@@ -33,13 +94,56 @@ def read_type_hint(type_: TypeHint) -> tuple[TypeHint, tuple[TypeHint, ...]]:
     base_type = type_ if base_type is None else base_type
     args = typing.get_args(type_)
 
-    args = tuple((types.NoneType if t is None else t) for t in args)
+    if None in args:
+        args = tuple((types.NoneType if t is None else t) for t in args)
 
     return base_type, args
 
 
+_MAPPING_TYPES = frozenset({dict, collections.OrderedDict, collections.defaultdict, collections.Counter})
+_MAPPING_FROM_DICT_TYPES = frozenset({dict, collections.OrderedDict, collections.Counter})
+_COLLECTION_TYPES = frozenset({list, tuple, set, frozenset, collections.deque})
+
+
+def flatten_union(args: tuple[TypeHint, ...]) -> tuple[TypeHint, ...]:
+    """
+    Inlines union arms that are unions themselves. typing already flattens directly nested unions, but not ones behind
+    an `Annotated` that carries no serialization metadata, e.g. `int | Annotated[str | None, "doc"]`.
+    """
+    flat = []
+
+    for arg in args:
+        origin, arg_args = read_type_hint(arg)
+
+        if origin is typing.Annotated and not any(isinstance(a, (Label, SerializeAs)) for a in arg_args[1:]):
+            inner_origin, inner_args = read_type_hint(arg_args[0])
+
+            if inner_origin in (typing.Union, types.UnionType):
+                origin, arg_args = inner_origin, inner_args
+
+        for flat_arg in (flatten_union(arg_args) if origin in (typing.Union, types.UnionType) else (arg,)):
+            if flat_arg not in flat:
+                flat.append(flat_arg)
+
+    return tuple(flat)
+
+
+@functools.lru_cache(maxsize=None)
+def _container_kind(base_type: type) -> typing.Literal["mapping", "collection"] | None:
+    # the ABC checks go through __subclasshook__ and the abc registry, so only do them once per class
+    if issubclass(base_type, collections.abc.Mapping):
+        return "mapping"
+
+    if issubclass(base_type, collections.abc.Collection) and not issubclass(base_type, (str, bytes)):
+        return "collection"
+
+    return None
+
+
 class SerializerDeserializerCodegenSuper(abc.ABC):
     codegen: code_generator.CodeGenerator
+    # plain classes known to be scalar, checked before falling back to is_scalar
+    scalar_types: typing.ClassVar[frozenset[type]] = frozenset()
 
     def __init__(self):
         self.labels: dict[str, type] = {}
@@ -52,6 +156,28 @@ class SerializerDeserializerCodegenSuper(abc.ABC):
     def scalar(self, type_: TypeHint, in_var: str, out_var: str):
         raise NotImplementedError
 
+    def compiles_to_identity(self, type_: TypeHint) -> bool:
+        """Whether values of `type_` are passed through unchanged, allowing callers to skip emitting any code."""
+        return False
+
+    def expr(self, type_: TypeHint, in_expr: str) -> str | None:
+        """Returns a single expression converting `in_expr`, or None if `type_` requires emitting statements."""
+        if self.compiles_to_identity(type_):
+            return in_expr
+
+        return None
+
+    def emit(self, type_: TypeHint, in_var: str, out_var: str) -> str:
+        """Converts `in_var` and returns an expression of the result, emitting statements into `out_var` only if
+        `type_` can't be converted inline."""
+        out = self.expr(type_, in_var)
+
+        if out is None:
+            self.any(type_, in_var, out_var)
+            out = out_var
+
+        return out
+
     @abc.abstractmethod
     def tuple_(self, class_: type, in_vars: list[str], out_var: str):
         raise NotImplementedError
@@ -101,6 +227,11 @@ class SerializerDeserializerCodegenSuper(abc.ABC):
         self.any(annotated_type, in_var, out_var)
 
     def any(self, type_: TypeHint, in_var: str, out_var: str):
+        # temporaries of a node are dead once its result is in out_var, so their names can be reused by its siblings
+        with self.codegen.scope():
+            self._any(type_, in_var, out_var)
+
+    def _any(self, type_: TypeHint, in_var: str, out_var: str):
         self.codegen.comment(repr(type_))
 
         if isinstance(type_, Label):
@@ -119,7 +250,7 @@ class SerializerDeserializerCodegenSuper(abc.ABC):
             self.annotated(annotated_type, annotation, in_var, out_var)
             return
 
-        if self.is_scalar(type_):
+        if (isinstance(type_, type) and type_ in self.scalar_types) or self.is_scalar(type_):
             self.scalar(type_, in_var, out_var)
             return
 
@@ -142,7 +273,14 @@ class SerializerDeserializerCodegenSuper(abc.ABC):
         self.type_(type_, base_type, args, in_var, out_var)
 
     def type_(self, type_: TypeHint, base_type: type, args: tuple[TypeHint, ...], in_var: str, out_var: str):
-        if issubclass(base_type, collections.abc.Mapping):
+        if base_type in _MAPPING_TYPES:
+            container_kind = "mapping"
+        elif base_type in _COLLECTION_TYPES:
+            container_kind = "collection"
+        else:
+            container_kind = _container_kind(base_type)
+
+        if container_kind == "mapping":
             if len(args) != 2:
                 raise serializable_errors.SerializationError(
                     f"Serialization type {type_} of a mapping must specify key and value types."
@@ -151,16 +289,18 @@ class SerializerDeserializerCodegenSuper(abc.ABC):
             self.mapping(base_type, args[0], args[1], in_var, out_var)
             return
 
-        if issubclass(base_type, collections.abc.Collection) and not issubclass(base_type, (str, bytes)):
+        if container_kind == "collection":
             if base_type is tuple and not (len(args) == 2 and args[1] is Ellipsis):
                 args_vars = self.codegen.get_vars(len(args))
 
-                for i, (arg_var, arg_type) in enumerate(zip(args_vars, args)):
-                    tmp = self.codegen.assign_new(f"{in_var}[{i}]")
-                    self.any(arg_type, tmp, arg_var)
+                if args_vars:
+                    # one unpack instead of a subscript per element
+                    self.codegen.literal(f"{', '.join(args_vars)}, = {in_var}")
+
+                args_exprs = [self.emit(arg_type, arg_var, arg_var) for arg_var, arg_type in zip(args_vars, args)]
 
                 self.tuple_(
-                    base_type, args_vars, out_var
+                    base_type, args_exprs, out_var
                 )
                 return
             else:
@@ -184,51 +324,146 @@ class SerializerCodegen(SerializerDeserializerCodegenSuper, abc.ABC):
         super().__init__()
 
     def mapping(self, _, key_type: TypeHint, value_type: TypeHint, in_var: str, out_var: str):
-        self.codegen.assign(in_var, f"list({in_var}.items())")
-        self.any(list[tuple[key_type, value_type]], in_var, out_var)
+        # serialized as a list of (key, value) pairs, written in a single pass over the items
+        list_var, key_var, value_var = self.codegen.get_vars(3)
+        key_expr = self.expr(key_type, key_var)
+        # expr() may emit toplevel code, so only try the value once the key is known to be inline as well
+        value_expr = None if key_expr is None else self.expr(value_type, value_var)
+
+        if key_expr == key_var and value_expr == value_var:
+            self.codegen.assign(out_var, f"list({in_var}.items())")
+            return
+
+        if key_expr is not None and value_expr is not None:
+            self.codegen.assign(
+                out_var, f"[({key_expr}, {value_expr}) for {key_var}, {value_var} in {in_var}.items()]"
+            )
+            return
+
+        self.codegen.assign(list_var, "[]")
+        self.codegen.literal(f"for {key_var}, {value_var} in {in_var}.items():")
+        self.codegen.indent()
+
+        if key_expr is None:
+            self.any(key_type, key_var, key_var)
+            key_expr = key_var
+            value_expr = self.emit(value_type, value_var, value_var)
+        else:
+            self.any(value_type, value_var, value_var)
+            value_expr = value_var
+
+        self.codegen.literal(f"{list_var}.append(({key_expr}, {value_expr}))")
+        self.codegen.dedent()
+        self.codegen.assign(out_var, list_var)
 
     def collection(self, _, element_type: TypeHint, in_var: str, out_var: str):
-        elem_i, elem_var = self.codegen.get_vars(2)
-        self.codegen.assign(out_var, f"list({in_var})")
-        self.codegen.literal(f"for {elem_i}, {elem_var} in enumerate({out_var}):")
+        list_var, elem_var = self.codegen.get_vars(2)
+        elem_expr = self.expr(element_type, elem_var)
+
+        if elem_expr == elem_var:
+            self.codegen.assign(out_var, f"list({in_var})")
+            return
+
+        if elem_expr is not None:
+            self.codegen.assign(out_var, f"[{elem_expr} for {elem_var} in {in_var}]")
+            return
+
+        # appending beats copying the input and then overwriting every item
+        self.codegen.assign(list_var, "[]")
+        self.codegen.literal(f"for {elem_var} in {in_var}:")
         self.codegen.indent()
         self.any(element_type, elem_var, elem_var)
-        self.codegen.assign(f"{out_var}[{elem_i}]", elem_var)
+        self.codegen.literal(f"{list_var}.append({elem_var})")
         self.codegen.dedent()
+        self.codegen.assign(out_var, list_var)
+
+    def expr(self, type_: TypeHint, in_expr: str) -> str | None:
+        out = super().expr(type_, in_expr)
+
+        if out is None:
+            base_type, args = read_type_hint(type_)
+
+            if base_type in (typing.Union, types.UnionType):
+                out = self.union_expr(args, in_expr)
+
+        return out
 
     def union(self, args: tuple[TypeHint, ...], in_var: str, out_var: str):
+        self.codegen.assign(out_var, self.union_expr(args, in_var))
+
+    def union_expr(self, args: tuple[TypeHint, ...], in_expr: str) -> str | None:
+        args = flatten_union(args)
         base_types = [self.get_real_origin(arg) for arg in args]
 
-        for i, base_type in enumerate(base_types):
-            for j, base_type2 in enumerate(base_types):
-                if i == j:
-                    continue
+        seen_base_types = set()
 
-                if base_type is base_type2:
-                    raise serializable_errors.SerializationError(
-                        "Cannot serialize union of two generic types that have the same origin."
-                    )
+        for base_type in base_types:
+            if id(base_type) in seen_base_types:
+                raise serializable_errors.SerializationError(
+                    "Cannot serialize union of two generic types that have the same origin."
+                )
+
+            seen_base_types.add(id(base_type))
+
+        # every arm becomes a toplevel function, so that values of exactly an arm's type dispatch with one lookup
+        arm_funcs = []
+
+        for arg, origin in zip(args, base_types):
+            arm_func = f"serialize_union_arm_{self.codegen.get_global_var()}"
+            arg_var, ret_var = self.codegen.get_vars(2)
+
+            self.codegen.begin_toplevel_function(arm_func, [arg_var])
+            arg_expr = self.emit(arg, arg_var, self.codegen.get_var())
 
-        for i, (arg, origin) in enumerate(zip(args, base_types)):
             # type_identifier = i
             type_identifier = origin.__name__
+            self.codegen.assign(ret_var, f"({type_identifier!r}, {arg_expr})")
+            self.codegen.end_toplevel_function(ret_var)
+
+            arm_funcs.append(arm_func)
+
+        # anything else (subclasses, virtual subclasses, ...) goes through the isinstance chain
+        fallback_func = f"serialize_union_fallback_{self.codegen.get_global_var()}"
+        arg_var = self.codegen.get_var()
+        self.codegen.begin_toplevel_function(fallback_func, [arg_var])
 
+        for i, (origin, arm_func) in enumerate(zip(base_types, arm_funcs)):
             type_var = self.codegen.get_const(origin)
 
-            self.codegen.literal(f"{'el' if i != 0 else ''}if isinstance({in_var}, {type_var}):")
+            self.codegen.literal(f"{'el' if i != 0 else ''}if isinstance({arg_var}, {type_var}):")
             self.codegen.indent()
-            tmp = self.codegen.assign_new(f"({type_identifier!r}, {in_var})")
-            self.any(tuple[int, arg], tmp, out_var)
+            self.codegen.literal(f"return {arm_func}({arg_var})")
             self.codegen.dedent()
 
         self.codegen.literal("else:")
         self.codegen.indent()
         self.codegen.literal(
             f"raise {self.codegen.get_const(serializable_errors.SerializationError)}("
-            f"f'Unexpected type for union: {{type({in_var})!r}} of {{{in_var}!r}}'"
+            f"f'Unexpected type for union: {{type({arg_var})!r}} of {{{arg_var}!r}}'"
             f")"
         )
         self.codegen.dedent()
+        self.codegen.end_toplevel_function(None)
+
+        # map each arm's type to the arm the isinstance chain would pick for it
+        dispatch = []
+
+        for origin in base_types:
+            for other, arm_func in zip(base_types, arm_funcs):
+                try:
+                    matches = issubclass(origin, other)
+                except TypeError:
+                    # can't be decided statically, leave it to the isinstance chain
+                    break
+
+                if matches:
+                    dispatch.append(f"{self.codegen.get_const(origin)}: {arm_func}")
+                    break
+
+        dispatch_var = self.codegen.get_global_var()
+        self.codegen.toplevel_assign(dispatch_var, "{" + ", ".join(dispatch) + "}")
+
+        return f"{dispatch_var}.get(type({in_expr}), {fallback_func})({in_expr})"
 
 
 class DeserializerCodegen(SerializerDeserializerCodegenSuper, abc.ABC):
@@ -237,9 +472,21 @@ class DeserializerCodegen(SerializerDeserializerCodegenSuper, abc.ABC):
         super().__init__()
 
     def mapping(self, class_: type, key_type: TypeHint, value_type: TypeHint, in_var: str, out_var: str):
-        class_var = self.codegen.get_const(class_)
         tmp, key_var, value_var = self.codegen.get_vars(3)
+        key_expr = self.expr(key_type, key_var)
+        value_expr = self.expr(value_type, value_var)
 
+        # other mapping classes (e.g. defaultdict) can't be constructed from a dict, so they are filled item by item
+        if key_expr is not None and value_expr is not None and class_ in _MAPPING_FROM_DICT_TYPES:
+            comprehension = f"{{{key_expr}: {value_expr} for {key_var}, {value_var} in {in_var}}}"
+
+            if class_ is dict:
+                self.codegen.assign(out_var, comprehension)
+            else:
+                self.codegen.assign(out_var, f"{self.codegen.get_const(class_)}({comprehension})")
+            return
+
+        class_var = self.codegen.get_const(class_)
         self.codegen.assign(tmp, f"{class_var}()")
         self.codegen.literal(f"for {key_var}, {value_var} in {in_var}:")
         self.codegen.indent()
@@ -250,17 +497,36 @@ class DeserializerCodegen(SerializerDeserializerCodegenSuper, abc.ABC):
         self.codegen.assign(out_var, tmp)
 
     def collection(self, class_: type, element_type: TypeHint, in_var: str, out_var: str):
-        class_var = self.codegen.get_const(class_)
+        list_var, elem_var = self.codegen.get_vars(2)
+        elem_expr = self.expr(element_type, elem_var)
+
+        if elem_expr is not None:
+            if elem_expr == elem_var:
+                elements = in_var
+            else:
+                elements = f"[{elem_expr} for {elem_var} in {in_var}]"
 
-        elem_i, elem_var = self.codegen.get_vars(2)
-        self.codegen.literal(f"for {elem_i}, {elem_var} in enumerate({in_var}):")
+            if class_ is list and elements != in_var:
+                self.codegen.assign(out_var, elements)
+            else:
+                self.codegen.assign(out_var, f"{self.codegen.get_const(class_)}({elements})")
+            return
+
+        # appending beats writing every item back into the input by index
+        self.codegen.assign(list_var, "[]")
+        self.codegen.literal(f"for {elem_var} in {in_var}:")
         self.codegen.indent()
         self.any(element_type, elem_var, elem_var)
-        self.codegen.assign(f"{in_var}[{elem_i}]", elem_var)
-        self.codegen.assign(out_var, f"{class_var}({in_var})")
+        self.codegen.literal(f"{list_var}.append({elem_var})")
         self.codegen.dedent()
 
+        if class_ is list:
+            self.codegen.assign(out_var, list_var)
+        else:
+            self.codegen.assign(out_var, f"{self.codegen.get_const(class_)}({list_var})")
+
     def union(self, args: tuple[TypeHint, ...], in_var: str, out_var: str):
+        args = flatten_union(args)
         base_types = [self.get_real_origin(arg) for arg in args]
 
         for i, (arg, origin) in enumerate(zip(args, base_types)):
@@ -0,0 +1,59 @@
+import collections
+
+import pytest
+
+from pipifax_io import json_serialization
+from pipifax_io import serializable_errors
+
+
+def test_pydantic_subclass_keeps_fields():
+    pydantic = pytest.importorskip("pydantic")
+
+    class A(pydantic.BaseModel):
+        model_config = pydantic.ConfigDict(extra="forbid")
+
+        x: int
+
+    class B(A):
+        y: int
+
+    class Holder(pydantic.BaseModel):
+        a: A
+
+    value = B(x=1, y=2)
+
+    assert json_serialization.compile_json_serializer(A)(value) == {"x": 1, "y": 2}
+    assert json_serialization.compile_json_serializer(list[A])([value]) == [{"x": 1, "y": 2}]
+    assert json_serialization.compile_json_serializer(A | int)(value) == ("A", {"x": 1, "y": 2})
+
+    # nested fields are serialized as their declared model, like model_dump does, so the output still deserializes
+    serialized = json_serialization.compile_json_serializer(Holder)(Holder(a=value))
+    assert serialized == {"a": {"x": 1}}
+    assert json_serialization.compile_json_deserializer(Holder)(serialized) == Holder(a=A(x=1))
+
+    serialized = json_serialization.compile_json_serializer(list[Holder])([Holder(a=value)])
+    assert serialized == [{"a": {"x": 1}}]
+    assert json_serialization.compile_json_deserializer(list[Holder])(serialized) == [Holder(a=A(x=1))]
+
+
+def test_defaultdict_round_trip():
+    type_ = collections.defaultdict[int, str]
+    value = collections.defaultdict(None, {1: "a", 2: "b"})
+
+    serialized = json_serialization.compile_json_serializer(type_)(value)
+    deserialized = json_serialization.compile_json_deserializer(type_)(serialized)
+
+    assert type(deserialized) is collections.defaultdict
+    assert deserialized == value
+
+
+def test_type_blind_handlers_not_shared_between_classes():
+    class WithSerializeJson:
+        @staticmethod
+        def serialize_json():
+            return "serialized"
+
+    assert json_serialization._serialize_json_type_blind(WithSerializeJson) == "serialized"
+
+    with pytest.raises(serializable_errors.SerializationError):
+        json_serialization._serialize_json_type_blind(int)
@@ -9,19 +9,19 @@ class _GeneratorLengthHint:
 
 
 class _LengthedGenerator(collections.abc.Generator):
+    # send and throw are slots holding the generator's own bound methods, which skips a call layer per item. being
+    # concrete class attributes, they also implement the abstract methods of Generator.
+    __slots__ = ("_generator", "_length", "send", "throw", "__weakref__")
+
     def __init__(self, generator: typing.Generator, length: int):
         self._generator = generator
         self._length = length
+        self.send = generator.send
+        self.throw = generator.throw
 
     def __len__(self):
         return self._length
 
-    def send(self, value) -> typing.Any:
-        return self._generator.send(value)
-
-    def throw(self, typ, value=None, traceback=None) -> typing.Any:
-        return self._generator.throw(typ, value, traceback)
-
 
 def generator_length[** P, Y, S, R](generator_func: typing.Callable[P, typing.Generator[Y, S, R]]) -> typing.Callable[
     P, _LengthedGenerator[Y, S, R]]:
@@ -29,7 +29,8 @@ def generator_length[** P, Y, S, R](generator_func: typing.Callable[P, typing.Ge
         it = generator_func(*args, **kwargs)
         _length_hint = next(it, None)
 
-        if isinstance(_length_hint, _GeneratorLengthHint):
+        # _GeneratorLengthHint is private and never subclassed
+        if type(_length_hint) is _GeneratorLengthHint:
             return _LengthedGenerator(it, _length_hint.length)
         else:
             return it
@@ -37,5 +38,29 @@ def generator_length[** P, Y, S, R](generator_func: typing.Callable[P, typing.Ge
     return wrapper
 
 
+def generator_length_strict[** P, Y, S, R](generator_func: typing.Callable[P, typing.Generator[Y, S, R]]) -> (
+    typing.Callable[P, _LengthedGenerator[Y, S, R]]
+):
+    """Like generator_length, but the generator must always yield a length hint first."""
+
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> _LengthedGenerator[Y, S, R]:
+        it = generator_func(*args, **kwargs)
+
+        try:
+            _length_hint = next(it)
+        except StopIteration:
+            raise ValueError(f"{generator_func.__qualname__} returned without yielding a length hint.") from None
+
+        # no type check on the happy path, a wrong first item only shows up as a missing attribute
+        try:
+            return _LengthedGenerator(it, _length_hint.length)
+        except AttributeError:
+            raise TypeError(
+                f"{generator_func.__qualname__} must yield a length hint first, got {_length_hint!r}."
+            ) from None
+
+    return wrapper
+
+
 def length_hint(length: int):
     return _GeneratorLengthHint(length)
@@ -0,0 +1,33 @@
+import pytest
+
+import pipifax_lengthed_generator
+
+
+@pipifax_lengthed_generator.generator_length_strict
+def _counting(n: int):
+    yield pipifax_lengthed_generator.length_hint(n)
+    yield from range(n)
+
+
+def test_generator_length_strict():
+    it = _counting(3)
+
+    assert len(it) == 3
+    assert list(it) == [0, 1, 2]
+
+
+def test_generator_length_strict_without_hint():
+    @pipifax_lengthed_generator.generator_length_strict
+    def no_hint():
+        yield 1
+
+    @pipifax_lengthed_generator.generator_length_strict
+    def empty():
+        return
+        yield
+
+    with pytest.raises(TypeError):
+        no_hint()
+
+    with pytest.raises(ValueError):
+        empty()
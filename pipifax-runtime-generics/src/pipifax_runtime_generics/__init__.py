@@ -1,3 +1,5 @@
+import weakref
+
 __all__ = ["Generic", "GenericMetaclass"]
 
 
@@ -5,13 +7,33 @@ class GenericMetaclass(type):
     def __init__(cls, name: str, bases: tuple[type, ...], namespace: dict[str, object]):
         super().__init__(name, bases, namespace)
 
+        # subscriptions of this class, so that e.g. MyGeneric[int] is MyGeneric[int]
+        cls.__generic_subscriptions__ = weakref.WeakValueDictionary()
+
     def __getitem__[T](self: T, item) -> T:
         # self = the generic class that wants to be subscripted
         if not isinstance(item, tuple):
             item = item,
 
+        # equal arguments can still differ (e.g. 1 and True, or reordered unions), so key on type and repr. the check
+        # below tells apart distinct arguments with the same repr (e.g. two local classes of the same name).
+        try:
+            key = tuple((type(arg), repr(arg)) for arg in item)
+            cached = self.__generic_subscriptions__.get(key)
+
+            if cached is not None and all(a is b or a == b for a, b in zip(cached.__generic_args__, item)):
+                return cached
+        except Exception:
+            # arguments whose repr or comparison fails (or is ambiguous, like arrays) aren't cached
+            key = None
+
         # return a new class with the given generic arguments saved and a subclass of self
-        return type(self.__name__, (self,), {"__generic_args__": item, "__base_class__": self})
+        subscripted = type(self.__name__, (self,), {"__generic_args__": item, "__base_class__": self})
+
+        if key is not None:
+            self.__generic_subscriptions__[key] = subscripted
+
+        return subscripted
 
     def __repr__(self: type["Generic"]):
         if self.__base_class__ is None: